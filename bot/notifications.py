@@ -2,22 +2,92 @@
 Format and send property-match notifications to Telegram users.
 """
 
+import asyncio
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from telegram import Bot
-from telegram.error import TelegramError
-from parser.listing_parser import Listing, Property
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+from parser.listing_parser import Listing, Property, _WS, _WS_CHARS, _fast_re
 
 logger = logging.getLogger(__name__)
 
 SOURCE_URL = "https://www.sheroot.co.za/fixed-property-sales.html"
 
-# Lines to strip from raw_text to avoid duplicating size / reserve lines
-_CLEANUP_RE = re.compile(
-    r'^\s*(?:\d[\d\s]*m\u00b2|No\s+Court\s+Reserve|Bank\s+Reserve|R[\d\s,]+Court\s+Reserve.*)\s*$',
-    re.IGNORECASE | re.MULTILINE,
+# Attempts per message; flood-control waits and transient errors are retried
+_SEND_ATTEMPTS = 3
+
+# Lines to strip from raw_text to avoid duplicating size / reserve lines.
+# Compiled with the parser's engine choice (RE2 when google-re2 is installed).
+# Written in the syntax subset shared by re and RE2: inline flags instead of
+# re.IGNORECASE | re.MULTILINE, a literal "²" since RE2 has no \uXXXX, and
+# the parser's _WS / [0-9] since RE2's \s and \d are ASCII-only.
+_CLEANUP_RE = _fast_re.compile(
+    rf'(?im)^{_WS}*(?:[0-9][0-9{_WS_CHARS}]*m' '\u00b2'
+    rf'|No{_WS}+Court{_WS}+Reserve|Bank{_WS}+Reserve'
+    rf'|R[0-9{_WS_CHARS},]+Court{_WS}+Reserve.*){_WS}*$'
+)
+
+# Three or more consecutive newlines, collapsed to one blank line
+_BLANKLINES_RE = re.compile(r'\n{3,}')
+
+# Emoji prefixes used in message templates
+_EMOJI_HOUSE = "\U0001f3e0"
+_EMOJI_DATE = "\U0001f4c5"
+_EMOJI_PIN = "\U0001f4cd"
+_EMOJI_MONEY = "\U0001f4b0"
+_EMOJI_TYPE = "\U0001f3d7"
+_EMOJI_ERF = "\U0001f4dd"
+_EMOJI_SIZE = "\U0001f4d0"
+_EMOJI_LINK = "\U0001f517"
+
+# Message layouts are fixed; only field values vary, so the templates are
+# built once and their bound .format methods called per message.
+_LISTING_TMPL = (
+    _EMOJI_HOUSE + " *NEW SALE IN EXECUTION MATCH*\n"
+    + _EMOJI_DATE + " Date: {date}\n"
+    + _EMOJI_PIN + " Location: {loc}\n"
+    + _EMOJI_MONEY + " Price: {price}\n"
+    + _EMOJI_TYPE + " Type: {ptype}\n"
+    + _EMOJI_ERF + " ERF: {erf}\n"
+    "---\n"
+    "{desc}\n"
+    "---\n"
+    + _EMOJI_LINK + " [Source: sheroot.co.za](" + SOURCE_URL + ")"
+)
+_LISTING_FMT = _LISTING_TMPL.format
+
+_PROPERTY_TMPL = (
+    _EMOJI_HOUSE + " *Sale in Execution \u2014 {date}*\n"
+    "{body}\n"
+    "{size_line}"
+    "{reserve}\n"
+    "{link_line}"
 )
+_PROPERTY_FMT = _PROPERTY_TMPL.format
+
+# Human-readable sale dates keyed by ISO date — many properties share a date
+_DATE_FMT_CACHE: dict[str, str] = {}
+
+
+def _needs_cleanup(text: str) -> bool:
+    """Cheap pre-check: every _CLEANUP_RE alternative contains "m²" or "reserve"."""
+    # casefold() mirrors the pattern's IGNORECASE, so mixed case is caught too
+    return "\u00b2" in text or "reserve" in text.casefold()
+
+
+def _format_sale_date(sale_date: str) -> str:
+    cached = _DATE_FMT_CACHE.get(sale_date)
+    if cached is not None:
+        return cached
+    try:
+        dt = datetime.strptime(sale_date, "%Y-%m-%d")
+        date_str = f"{dt.day} {dt.strftime('%b')} {dt.year}"
+    except (ValueError, TypeError):
+        return sale_date or "TBD"
+    _DATE_FMT_CACHE[sale_date] = date_str
+    return date_str
 
 
 def format_listing_message(listing: Listing) -> str:
@@ -32,67 +102,101 @@ def format_listing_message(listing: Listing) -> str:
     if len(desc) > 1500:
         desc = desc[:1497] + "..."
 
-    msg = (
-        f"\U0001f3e0 *NEW SALE IN EXECUTION MATCH*\n"
-        f"\U0001f4c5 Date: {date_str}\n"
-        f"\U0001f4cd Location: {location_str}\n"
-        f"\U0001f4b0 Price: {price_str}\n"
-        f"\U0001f3d7 Type: {prop_type_str}\n"
-        f"\U0001f4dd ERF: {erf_str}\n"
-        f"---\n"
-        f"{desc}\n"
-        f"---\n"
-        f"\U0001f517 [Source: sheroot.co.za]({SOURCE_URL})"
+    return _LISTING_FMT(
+        date=date_str,
+        loc=location_str,
+        price=price_str,
+        ptype=prop_type_str,
+        erf=erf_str,
+        desc=desc,
     )
-    return msg
 
 
 def format_property_message(prop: Property) -> str:
     """Format a single Property as a Telegram Markdown message."""
-    # Human-readable sale date
-    try:
-        dt = datetime.strptime(prop.sale_date, "%Y-%m-%d")
-        date_str = f"{dt.day} {dt.strftime('%b')} {dt.year}"
-    except (ValueError, TypeError):
-        date_str = prop.sale_date or "TBD"
+    return _format_property_cached(
+        prop.sale_date,
+        prop.raw_text,
+        prop.size_m2,
+        prop.reserve_display,
+        prop.pdf_url,
+    )
+
+
+@lru_cache(maxsize=512)
+def _format_property_cached(sale_date: str, raw_text: str, size_m2: float | None,
+                            reserve_display: str, pdf_url: str) -> str:
+    # Keyed on hashable primitives so the same property fanned out to many
+    # users is only formatted once.
+    date_str = _format_sale_date(sale_date)
 
     # Clean raw_text: remove size and reserve lines to avoid duplication
-    body = _CLEANUP_RE.sub('', prop.raw_text).strip()
+    if _needs_cleanup(raw_text):
+        body = _CLEANUP_RE.sub('', raw_text).strip()
+    else:
+        body = raw_text.strip()
     # Collapse multiple blank lines
-    body = re.sub(r'\n{3,}', '\n\n', body)
+    body = _BLANKLINES_RE.sub('\n\n', body)
     if len(body) > 600:
         body = body[:597] + "..."
 
-    size_line = f"\U0001f4d0 {prop.size_m2:,.0f}m\u00b2\n" if prop.size_m2 else ""
-    link_line = f"\U0001f517 [Full property list]({prop.pdf_url})" if prop.pdf_url else f"\U0001f517 [Sheroot]({SOURCE_URL})"
+    size_line = f"{_EMOJI_SIZE} {size_m2:,.0f}m\u00b2\n" if size_m2 else ""
+    link_line = f"{_EMOJI_LINK} [Full property list]({pdf_url})" if pdf_url else f"{_EMOJI_LINK} [Sheroot]({SOURCE_URL})"
 
-    msg = (
-        f"\U0001f3e0 *Sale in Execution \u2014 {date_str}*\n"
-        f"{body}\n"
-        f"{size_line}"
-        f"{prop.reserve_display}\n"
-        f"{link_line}"
+    return _PROPERTY_FMT(
+        date=date_str,
+        body=body,
+        size_line=size_line,
+        reserve=reserve_display,
+        link_line=link_line,
     )
-    return msg
 
 
-async def send_notification(bot: Bot, chat_id: int, listing) -> bool:
-    """Send a formatted notification. Accepts Listing or Property. Returns True on success."""
+def _retry_after_seconds(exc: RetryAfter) -> float:
+    # python-telegram-bot >= 22 reports a timedelta, older versions an int
+    retry_after = exc.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+async def send_notification(bot: Bot, chat_id: int, listing,
+                            message: str | None = None) -> bool:
+    """
+    Send a formatted notification. Accepts Listing or Property. Returns True on success.
+    Pass a pre-formatted message to reuse it when notifying several users.
+    """
     if isinstance(listing, Property):
-        message = format_property_message(listing)
+        if message is None:
+            message = format_property_message(listing)
         log_label = f"property #{listing.number} on {listing.sale_date}"
     else:
-        message = format_listing_message(listing)
+        if message is None:
+            message = format_listing_message(listing)
         log_label = listing.title
-    try:
-        await bot.send_message(
-            chat_id=chat_id,
-            text=message,
-            parse_mode="Markdown",
-            disable_web_page_preview=False,
-        )
-        logger.info("Notification sent to chat_id=%s for %s", chat_id, log_label)
-        return True
-    except TelegramError as exc:
-        logger.error("Failed to send notification to chat_id=%s: %s", chat_id, exc)
-        return False
+
+    for attempt in range(_SEND_ATTEMPTS):
+        try:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=message,
+                parse_mode="Markdown",
+                disable_web_page_preview=False,
+            )
+            logger.info("Notification sent to chat_id=%s for %s", chat_id, log_label)
+            return True
+        except RetryAfter as exc:
+            error, delay = exc, _retry_after_seconds(exc) + 0.1
+        except (BadRequest, Forbidden) as exc:
+            # Malformed message or bot blocked — retrying cannot help
+            logger.error("Failed to send notification to chat_id=%s: %s", chat_id, exc)
+            return False
+        except TelegramError as exc:
+            error, delay = exc, 2 ** attempt
+        if attempt + 1 < _SEND_ATTEMPTS:
+            logger.warning("Send to chat_id=%s failed (%s), retrying in %.1fs", chat_id, error, delay)
+            await asyncio.sleep(delay)
+
+    logger.error("Failed to send notification to chat_id=%s after %d attempts: %s",
+                 chat_id, _SEND_ATTEMPTS, error)
+    return False
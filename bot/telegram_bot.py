@@ -11,9 +11,11 @@ Commands:
   /help               - Help text
 """
 
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CommandHandler,
     ContextTypes,
@@ -21,9 +23,13 @@ from telegram.ext import (
 
 from datetime import date as _date
 from database import db
-from parser.listing_parser import parse_listings, parse_pdf_properties, property_from_db, Property
+from parser.listing_parser import parse_listings, property_from_db, Property
 from bot.notifications import format_listing_message, format_property_message
-from scheduler.job_scheduler import _matches_property
+from scheduler.job_scheduler import (
+    _matches_property_fast,
+    _normalize_preference,
+    parse_events_properties,
+)
 from config import TELEGRAM_BOT_TOKEN
 
 logger = logging.getLogger(__name__)
@@ -45,13 +51,53 @@ def _pref_summary(pref: dict | None) -> str:
     )
 
 
+def _pref_matcher(pref: dict):
+    """Return a predicate testing a Property against pref, normalising it once."""
+    normalized = _normalize_preference(pref)
+    if normalized["kws_lc"]:
+        return lambda p: _matches_property_fast(p, normalized, p.text_lower)
+    return lambda p: _matches_property_fast(p, normalized, "")
+
+
+def _filter_for_pref(props: list[Property], pref: dict) -> list[Property]:
+    return list(filter(_pref_matcher(pref), props))
+
+
+async def _reply_properties(update: Update, props: list[Property]):
+    """
+    Send one message per property, formatting in a worker thread while
+    earlier messages are in flight. Sends are not awaited one by one: the
+    application's rate limiter queues them so Telegram's flood limits are
+    respected.
+    """
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=4)
+
+    async def produce():
+        try:
+            for prop in props:
+                await queue.put(await asyncio.to_thread(format_property_message, prop))
+        finally:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    sends: list[asyncio.Task] = []
+    while (msg := await queue.get()) is not None:
+        sends.append(asyncio.create_task(update.message.reply_text(
+            msg,
+            parse_mode="Markdown",
+            disable_web_page_preview=True,
+        )))
+    await asyncio.gather(producer, *sends)
+
+
 # ---------------------------------------------------------------------------
 # Command handlers
 # ---------------------------------------------------------------------------
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
-    db.upsert_user(
+    await asyncio.to_thread(
+        db.upsert_user,
         telegram_id=user.id,
         chat_id=update.effective_chat.id,
         username=user.username,
@@ -103,12 +149,14 @@ async def cmd_setprice(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Minimum price cannot be greater than maximum price.")
         return
 
-    db.upsert_user(
+    await asyncio.to_thread(
+        db.upsert_user,
         telegram_id=update.effective_user.id,
         chat_id=update.effective_chat.id,
         username=update.effective_user.username,
     )
-    db.upsert_preference(
+    await asyncio.to_thread(
+        db.upsert_preference,
         telegram_id=update.effective_user.id,
         min_price=min_price,
         max_price=max_price,
@@ -132,12 +180,14 @@ async def cmd_setlocation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("No valid keywords provided.")
         return
 
-    db.upsert_user(
+    await asyncio.to_thread(
+        db.upsert_user,
         telegram_id=update.effective_user.id,
         chat_id=update.effective_chat.id,
         username=update.effective_user.username,
     )
-    db.upsert_preference(
+    await asyncio.to_thread(
+        db.upsert_preference,
         telegram_id=update.effective_user.id,
         location_keywords=keywords,
     )
@@ -147,34 +197,39 @@ async def cmd_setlocation(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def cmd_mypreferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    pref = db.get_preference(update.effective_user.id)
+    pref = await asyncio.to_thread(db.get_preference, update.effective_user.id)
     await update.message.reply_text(_pref_summary(pref))
 
 
 async def cmd_clearpreferences(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    db.clear_preference(update.effective_user.id)
+    await asyncio.to_thread(db.clear_preference, update.effective_user.id)
     await update.message.reply_text("✅ Preferences cleared. You will no longer receive notifications.")
 
 
 async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show upcoming property listings, served from DB cache when available."""
     today = _date.today().isoformat()
-    pref = db.get_preference(update.effective_user.id)
+    pref = await asyncio.to_thread(db.get_preference, update.effective_user.id)
 
     # --- Fast path: serve from DB cache ---
-    cached_rows = db.get_upcoming_properties(today)
+    # Summary rows carry no raw_text: it is loaded up front only when keyword
+    # matching needs it, otherwise just for the properties displayed.
+    cached_rows = await asyncio.to_thread(db.get_upcoming_properties_summary, today)
     if cached_rows:
-        all_properties = [property_from_db(r) for r in cached_rows]
+        hydrated = bool(pref and pref.get("location_keywords"))
+        if hydrated:
+            cached_rows = await asyncio.to_thread(db.get_upcoming_properties, today)
+        entries = [(r["property_hash"], property_from_db(r)) for r in cached_rows]
 
         if pref:
-            filtered = [p for p in all_properties if _matches_property(p, pref)]
+            matches = _pref_matcher(pref)
+            entries = [(h, p) for h, p in entries if matches(p)]
             filter_note = " matching your preferences"
         else:
-            filtered = all_properties
             filter_note = ""
 
         cap = 15
-        total = len(filtered)
+        total = len(entries)
         if total == 0:
             await update.message.reply_text(
                 "No properties match your current preferences.\n"
@@ -186,9 +241,15 @@ async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"\U0001f4cb {total} propert{'y' if total == 1 else 'ies'}{filter_note} "
             f"(showing first {min(cap, total)}, served from cache):"
         )
-        for prop in filtered[:cap]:
-            msg = format_property_message(prop)
-            await update.message.reply_text(msg, parse_mode="Markdown", disable_web_page_preview=True)
+        shown = entries[:cap]
+        if hydrated:
+            props = [p for _, p in shown]
+        else:
+            full_rows = await asyncio.to_thread(
+                db.get_properties_by_hashes, [h for h, _ in shown]
+            )
+            props = [property_from_db(r) for r in full_rows]
+        await _reply_properties(update, props)
         return
 
     # --- Slow path: no cache yet, do a live scrape ---
@@ -206,14 +267,9 @@ async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     all_properties: list[Property] = []
-    for event in raw_events:
-        pdf_text = event.get("pdf_text", "")
-        pdf_url = event.get("pdf_url", "")
-        sale_date = event.get("date", "")
-        props = parse_pdf_properties(pdf_text, sale_date, pdf_url)
+    for props in await parse_events_properties(raw_events):
         # Cache them for next time
-        for prop in props:
-            db.upsert_property(prop)
+        await asyncio.to_thread(db.upsert_properties_bulk, props)
         all_properties.extend(props)
 
     if not all_properties:
@@ -228,7 +284,7 @@ async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     if pref:
-        filtered = [p for p in all_properties if _matches_property(p, pref)]
+        filtered = _filter_for_pref(all_properties, pref)
         filter_note = " matching your preferences"
     else:
         filtered = all_properties
@@ -240,9 +296,7 @@ async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"Found {total} propert{'y' if total == 1 else 'ies'}{filter_note} "
         f"(showing first {min(cap, total)}):"
     )
-    for prop in filtered[:cap]:
-        msg = format_property_message(prop)
-        await update.message.reply_text(msg, parse_mode="Markdown", disable_web_page_preview=True)
+    await _reply_properties(update, filtered[:cap])
 
 
 # ---------------------------------------------------------------------------
@@ -250,7 +304,26 @@ async def cmd_listings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ---------------------------------------------------------------------------
 
 def build_application() -> Application:
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    # Telegram allows ~30 msg/s overall and ~20 msg/min per group chat
+    rate_limiter = AIORateLimiter(
+        overall_max_rate=30,
+        overall_time_period=1,
+        group_max_rate=20,
+        group_time_period=60,
+    )
+    # One Bot instance (app.bot) with a pooled HTTP client is shared by the
+    # command handlers and the scheduler, so keep-alive sockets are reused.
+    app = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .rate_limiter(rate_limiter)
+        .connection_pool_size(128)
+        .pool_timeout(30)
+        .connect_timeout(10)
+        .read_timeout(30)
+        .get_updates_connection_pool_size(16)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", cmd_start))
     app.add_handler(CommandHandler("help", cmd_help))
@@ -1,30 +1,67 @@
 import sqlite3
 import json
+import threading
+import time
 from datetime import datetime
 from contextlib import contextmanager
 from config import DATABASE_PATH
 
 # Avoid circular import — Property is imported lazily inside upsert_property
 
-
-def get_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Timestamps are reused for up to this many seconds; sub-second precision of
+# created_at / first_seen_at is meaningless for this workload.
+_NOW_ISO_GRANULARITY = 0.5
+_now_iso_value: str = ""
+_now_iso_at: float = 0.0
+
+
+def _now_iso() -> str:
+    """Return datetime.utcnow().isoformat(), cached for _NOW_ISO_GRANULARITY seconds."""
+    global _now_iso_value, _now_iso_at
+    t = time.monotonic()
+    if not _now_iso_value or t - _now_iso_at > _NOW_ISO_GRANULARITY:
+        _now_iso_value = datetime.utcnow().isoformat()
+        _now_iso_at = t
+    return _now_iso_value
+
+
+# A single connection is shared by the whole process. The lock serialises
+# transactions so it can also be used from worker threads.
+_conn: sqlite3.Connection | None = None
+_conn_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return the shared connection, opening and tuning it on first use."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(
+            DATABASE_PATH,
+            check_same_thread=False,
+            isolation_level=None,  # transactions are managed by db_cursor
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        _conn = conn
+    return _conn
 
 
 @contextmanager
 def db_cursor():
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        yield cursor
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    with _conn_lock:
+        cursor = get_connection().cursor()
+        cursor.execute("BEGIN")
+        try:
+            yield cursor
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
 
 
 def init_db():
@@ -64,9 +101,82 @@ def init_db():
                 reserve_price REAL,
                 reserve_type TEXT,
                 pdf_url TEXT,
-                first_seen_at TEXT NOT NULL
+                first_seen_at TEXT NOT NULL,
+                raw_text_lc TEXT
             )
         """)
+        _migrate_raw_text_lc(cur)
+        _migrate_property_hashes(cur)
+        _migrate_keyword_encoding(cur)
+        # Serves get_upcoming_properties' range filter and ORDER BY without a sort
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_props_saledate_num "
+            "ON properties(sale_date, property_number)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_prefs_active "
+            "ON preferences(telegram_id, active)"
+        )
+
+
+def _migrate_raw_text_lc(cur):
+    """Add and backfill properties.raw_text_lc on databases created before it existed."""
+    columns = {r["name"] for r in cur.execute("PRAGMA table_info(properties)")}
+    if "raw_text_lc" in columns:
+        return
+    cur.execute("ALTER TABLE properties ADD COLUMN raw_text_lc TEXT")
+    # Python's lower() rather than SQLite's, which only folds ASCII
+    rows = cur.execute("SELECT property_hash, raw_text FROM properties").fetchall()
+    cur.executemany(
+        "UPDATE properties SET raw_text_lc = ? WHERE property_hash = ?",
+        [((r["raw_text"] or "").lower(), r["property_hash"]) for r in rows],
+    )
+
+
+def _migrate_property_hashes(cur):
+    """
+    Re-key properties hashed with SHA-256 (64 hex chars) to the current
+    property_hash(), carrying their seen_listings entries across so nothing
+    is re-notified.
+    """
+    from parser.listing_parser import property_from_db
+
+    rows = cur.execute(
+        "SELECT * FROM properties WHERE length(property_hash) = 64"
+    ).fetchall()
+    for row in rows:
+        old_hash = row["property_hash"]
+        new_hash = property_from_db(dict(row)).property_hash()
+        cur.execute(
+            "UPDATE properties SET property_hash = ? WHERE property_hash = ?",
+            (new_hash, old_hash),
+        )
+        cur.execute(
+            "UPDATE OR IGNORE seen_listings SET listing_hash = ? WHERE listing_hash = ?",
+            (new_hash, old_hash),
+        )
+
+
+def _migrate_keyword_encoding(cur):
+    """
+    Re-encode preferences.location_keywords stored as a JSON array (the
+    format before the delimited string) so reads never have to sniff it.
+    """
+    rows = cur.execute(
+        "SELECT id, location_keywords FROM preferences "
+        "WHERE location_keywords LIKE '[%'"
+    ).fetchall()
+    for row in rows:
+        try:
+            keywords = json.loads(row["location_keywords"])
+        except json.JSONDecodeError:
+            continue  # user input that merely starts with "["
+        if not isinstance(keywords, list):
+            continue
+        cur.execute(
+            "UPDATE preferences SET location_keywords = ? WHERE id = ?",
+            (_encode_keywords([str(kw) for kw in keywords]), row["id"]),
+        )
 
 
 # --- User CRUD ---
@@ -81,7 +191,7 @@ def upsert_user(telegram_id: int, chat_id: int, username: str | None):
                 chat_id = excluded.chat_id,
                 username = excluded.username
             """,
-            (telegram_id, chat_id, username, datetime.utcnow().isoformat()),
+            (telegram_id, chat_id, username, _now_iso()),
         )
 
 
@@ -93,10 +203,29 @@ def get_all_users() -> list[sqlite3.Row]:
 
 # --- Preferences CRUD ---
 
+# location_keywords are stored lower-cased and joined with a delimiter; a
+# keyword containing the delimiter is split into separate keywords on write.
+# Rows written before this format held a JSON array; init_db re-encodes them.
+_KEYWORD_SEP = "|"
+
+
+def _encode_keywords(keywords: list[str] | None) -> str | None:
+    if keywords is None:
+        return None
+    parts = (part.strip().lower() for kw in keywords for part in kw.split(_KEYWORD_SEP))
+    return _KEYWORD_SEP.join(part for part in parts if part)
+
+
+def _decode_keywords(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return value.split(_KEYWORD_SEP)
+
+
 def upsert_preference(telegram_id: int, min_price: float | None = None,
                       max_price: float | None = None,
                       location_keywords: list[str] | None = None):
-    keywords_json = json.dumps(location_keywords) if location_keywords is not None else None
+    keywords_enc = _encode_keywords(location_keywords)
     with db_cursor() as cur:
         existing = cur.execute(
             "SELECT id FROM preferences WHERE telegram_id = ?", (telegram_id,)
@@ -111,7 +240,7 @@ def upsert_preference(telegram_id: int, min_price: float | None = None,
                     active = 1
                 WHERE telegram_id = ?
                 """,
-                (min_price, max_price, keywords_json, telegram_id),
+                (min_price, max_price, keywords_enc, telegram_id),
             )
         else:
             cur.execute(
@@ -119,34 +248,33 @@ def upsert_preference(telegram_id: int, min_price: float | None = None,
                 INSERT INTO preferences (telegram_id, min_price, max_price, location_keywords, active)
                 VALUES (?, ?, ?, ?, 1)
                 """,
-                (telegram_id, min_price, max_price, keywords_json),
+                (telegram_id, min_price, max_price, keywords_enc),
             )
 
 
+# Hot-path SQL lives in module constants so every call passes the same
+# string and hits the connection's prepared-statement cache.
+_Q_GET_PREF = "SELECT * FROM preferences WHERE telegram_id = ? AND active = 1"
+_Q_ACTIVE_PREFS = "SELECT * FROM preferences WHERE active = 1"
+
+
 def get_preference(telegram_id: int) -> dict | None:
     with db_cursor() as cur:
-        row = cur.execute(
-            "SELECT * FROM preferences WHERE telegram_id = ? AND active = 1",
-            (telegram_id,),
-        ).fetchone()
+        row = cur.execute(_Q_GET_PREF, (telegram_id,)).fetchone()
         if row is None:
             return None
         result = dict(row)
-        if result.get("location_keywords"):
-            result["location_keywords"] = json.loads(result["location_keywords"])
+        result["location_keywords"] = _decode_keywords(result.get("location_keywords"))
         return result
 
 
 def get_all_active_preferences() -> list[dict]:
     with db_cursor() as cur:
-        rows = cur.execute(
-            "SELECT * FROM preferences WHERE active = 1"
-        ).fetchall()
+        rows = cur.execute(_Q_ACTIVE_PREFS).fetchall()
         prefs = []
         for row in rows:
             pref = dict(row)
-            if pref.get("location_keywords"):
-                pref["location_keywords"] = json.loads(pref["location_keywords"])
+            pref["location_keywords"] = _decode_keywords(pref.get("location_keywords"))
             prefs.append(pref)
         return prefs
 
@@ -161,6 +289,37 @@ def clear_preference(telegram_id: int):
 
 # --- Properties CRUD ---
 
+_Q_INSERT_PROPERTY = """
+    INSERT OR IGNORE INTO properties
+        (property_hash, sale_date, property_number, raw_text,
+         size_m2, reserve_price, reserve_type, pdf_url, first_seen_at,
+         raw_text_lc)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_Q_UPCOMING = """
+    SELECT * FROM properties
+    WHERE sale_date >= ?
+    ORDER BY sale_date, property_number
+"""
+_Q_UPCOMING_SUMMARY = """
+    SELECT property_hash, sale_date, property_number,
+           size_m2, reserve_price, reserve_type
+    FROM properties
+    WHERE sale_date >= ?
+    ORDER BY sale_date, property_number
+"""
+
+# Upcoming summary rows shared by concurrent /listings calls. Reset by every
+# insert that adds properties; reads and resets both happen under _conn_lock,
+# so a read cannot re-cache rows from before a committed insert.
+_UPCOMING_CACHE_TTL = 30  # seconds
+_upcoming_cache: dict = {"key": None, "ts": 0.0, "rows": []}
+
+
+def _invalidate_upcoming_cache():
+    _upcoming_cache["key"] = None
+
+
 def upsert_property(prop) -> bool:
     """
     Insert a property record if it does not already exist.
@@ -169,12 +328,7 @@ def upsert_property(prop) -> bool:
     h = prop.property_hash()
     with db_cursor() as cur:
         cur.execute(
-            """
-            INSERT OR IGNORE INTO properties
-                (property_hash, sale_date, property_number, raw_text,
-                 size_m2, reserve_price, reserve_type, pdf_url, first_seen_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _Q_INSERT_PROPERTY,
             (
                 h,
                 prop.sale_date,
@@ -184,24 +338,85 @@ def upsert_property(prop) -> bool:
                 prop.reserve_price,
                 prop.reserve_type,
                 prop.pdf_url,
-                datetime.utcnow().isoformat(),
+                _now_iso(),
+                prop.text_lower,
             ),
         )
-        return cur.rowcount > 0
+        inserted = cur.rowcount > 0
+        if inserted:
+            _invalidate_upcoming_cache()
+        return inserted
+
+
+def upsert_properties_bulk(props: list) -> int:
+    """
+    Insert many property records in a single transaction, ignoring ones
+    already present. Returns the number of newly inserted rows.
+    """
+    if not props:
+        return 0
+    now = _now_iso()
+    with db_cursor() as cur:
+        cur.executemany(
+            _Q_INSERT_PROPERTY,
+            [
+                (
+                    p.property_hash(),
+                    p.sale_date,
+                    p.number,
+                    p.raw_text,
+                    p.size_m2,
+                    p.reserve_price,
+                    p.reserve_type,
+                    p.pdf_url,
+                    now,
+                    p.text_lower,
+                )
+                for p in props
+            ],
+        )
+        if cur.rowcount:
+            _invalidate_upcoming_cache()
+        return cur.rowcount
 
 
 def get_upcoming_properties(today_iso: str) -> list[dict]:
     """Return all properties from DB with sale_date >= today, ordered by date and number."""
+    with db_cursor() as cur:
+        rows = cur.execute(_Q_UPCOMING, (today_iso,)).fetchall()
+        return [dict(r) for r in rows]
+
+
+def get_upcoming_properties_summary(today_iso: str) -> list[dict]:
+    """
+    Like get_upcoming_properties, but only the columns needed for price
+    filtering — raw_text and pdf_url are left out. Fetch full rows for the
+    properties actually displayed with get_properties_by_hashes.
+
+    Results are reused for _UPCOMING_CACHE_TTL seconds per day; treat the
+    returned list as read-only.
+    """
+    cache = _upcoming_cache
+    with db_cursor() as cur:
+        if cache["key"] == today_iso and time.monotonic() - cache["ts"] < _UPCOMING_CACHE_TTL:
+            return cache["rows"]
+        rows = [dict(r) for r in cur.execute(_Q_UPCOMING_SUMMARY, (today_iso,)).fetchall()]
+        cache.update(key=today_iso, ts=time.monotonic(), rows=rows)
+        return rows
+
+
+def get_properties_by_hashes(hashes: list[str]) -> list[dict]:
+    """Return full property rows for the given hashes, in the order given."""
+    if not hashes:
+        return []
+    placeholders = ", ".join("?" * len(hashes))
     with db_cursor() as cur:
         rows = cur.execute(
-            """
-            SELECT * FROM properties
-            WHERE sale_date >= ?
-            ORDER BY sale_date, property_number
-            """,
-            (today_iso,),
+            f"SELECT * FROM properties WHERE property_hash IN ({placeholders})",
+            hashes,
         ).fetchall()
-        return [dict(r) for r in rows]
+    by_hash = {r["property_hash"]: dict(r) for r in rows}
+    return [by_hash[h] for h in hashes if h in by_hash]
 
 
 def get_sale_dates_in_db(today_iso: str) -> set[str]:
@@ -216,20 +431,43 @@ def get_sale_dates_in_db(today_iso: str) -> set[str]:
 
 # --- Seen Listings CRUD ---
 
+_Q_IS_SEEN = "SELECT 1 FROM seen_listings WHERE listing_hash = ?"
+_Q_MARK_SEEN = "INSERT OR IGNORE INTO seen_listings (listing_hash, first_seen_at) VALUES (?, ?)"
+
 def is_listing_seen(listing_hash: str) -> bool:
     with db_cursor() as cur:
-        row = cur.execute(
-            "SELECT 1 FROM seen_listings WHERE listing_hash = ?", (listing_hash,)
-        ).fetchone()
+        row = cur.execute(_Q_IS_SEEN, (listing_hash,)).fetchone()
         return row is not None
 
 
+def get_all_seen_hashes() -> set[str]:
+    """Return every seen listing hash, for in-memory membership tests."""
+    with db_cursor() as cur:
+        cur.execute("SELECT listing_hash FROM seen_listings")
+        return {row[0] for row in cur.fetchall()}
+
+
 def mark_listing_seen(listing_hash: str):
     with db_cursor() as cur:
-        cur.execute(
-            """
-            INSERT OR IGNORE INTO seen_listings (listing_hash, first_seen_at)
-            VALUES (?, ?)
-            """,
-            (listing_hash, datetime.utcnow().isoformat()),
-        )
+        cur.execute(_Q_MARK_SEEN, (listing_hash, _now_iso()))
+
+
+# Rows per multi-row INSERT; 2 parameters each, well under SQLite's
+# historical 999 bound-parameter limit.
+_SEEN_BATCH_ROWS = 400
+
+
+def mark_listings_seen(listing_hashes: list[str]):
+    """Mark many listings as seen using multi-row INSERT statements."""
+    if not listing_hashes:
+        return
+    now = _now_iso()
+    with db_cursor() as cur:
+        for i in range(0, len(listing_hashes), _SEEN_BATCH_ROWS):
+            batch = listing_hashes[i:i + _SEEN_BATCH_ROWS]
+            placeholders = ", ".join(["(?, ?)"] * len(batch))
+            cur.execute(
+                "INSERT OR IGNORE INTO seen_listings (listing_hash, first_seen_at) "
+                f"VALUES {placeholders}",
+                [v for h in batch for v in (h, now)],
+            )
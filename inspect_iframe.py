@@ -6,30 +6,42 @@ from playwright.async_api import async_playwright
 
 sys.stdout.reconfigure(encoding="utf-8")
 
+CALENDAR_API_PATH = "inffuse.eventscalendar.co/js/v0.1/calendar/data"
+# Nothing but the embed scripts and the API call is needed to capture the data
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 async def inspect():
     async with async_playwright() as pw:
         browser = await pw.chromium.launch(headless=True)
         page = await browser.new_page()
+        await page.route("**/*", _block_heavy_resources)
 
         calendar_data = None
 
-        async def on_response(resp):
-            nonlocal calendar_data
-            if "inffuse.eventscalendar.co/js/v0.1/calendar/data" in resp.url:
-                try:
-                    calendar_data = await resp.json()
-                except Exception as e:
-                    print(f"Failed to parse JSON: {e}")
-
-        page.on("response", on_response)
-
-        await page.goto(
-            "https://www.sheroot.co.za/fixed-property-sales.html",
-            timeout=60000,
-            wait_until="networkidle",
-        )
-        await asyncio.sleep(5)
+        # Resolve as soon as the widget fires the API call instead of waiting
+        # for networkidle plus a fixed sleep.
+        try:
+            async with page.expect_response(
+                lambda r: CALENDAR_API_PATH in r.url, timeout=60000
+            ) as resp_info:
+                await page.goto(
+                    "https://www.sheroot.co.za/fixed-property-sales.html",
+                    timeout=60000,
+                    wait_until="domcontentloaded",
+                )
+            resp = await resp_info.value
+            print(f"Calendar API URL: {resp.url}\n")
+            calendar_data = await resp.json()
+        except Exception as e:
+            print(f"Failed to capture calendar JSON: {e}")
 
         if calendar_data:
             events = calendar_data.get("project", {}).get("data", {}).get("events", [])
@@ -7,12 +7,23 @@ import hashlib
 from dataclasses import dataclass, field
 from datetime import date as Date, datetime
 
+try:
+    # google-re2 matches in linear time; fall back to the stdlib engine when
+    # no wheel is available for the platform.
+    import re2 as _fast_re
+except ImportError:
+    _fast_re = re
 
 # ---------------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------------
 
-@dataclass
+def _dedup_hash(key: str) -> str:
+    """128-bit BLAKE2b hex digest — the hashes are dedup keys, not security."""
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
 class Listing:
     title: str
     raw_text: str
@@ -26,7 +37,7 @@ class Listing:
     def listing_hash(self) -> str:
         """Stable hash for deduplication – based on title + date + price."""
         key = f"{self.title}|{self.date}|{self.price}"
-        return hashlib.sha256(key.encode()).hexdigest()
+        return _dedup_hash(key)
 
 
 # ---------------------------------------------------------------------------
@@ -38,6 +49,14 @@ _PRICE_RE = re.compile(
     re.IGNORECASE,
 )
 
+# str.translate deletion tables. _WHITESPACE is everything \s matches (the
+# highest Unicode whitespace code point is U+3000); a _PRICE_RE match holds
+# only the currency R, whitespace, digits, commas and the decimal point.
+_WHITESPACE = "".join(c for c in map(chr, range(0x3001)) if c.isspace())
+_WS_TABLE = str.maketrans("", "", _WHITESPACE)
+_WS_COMMA_TABLE = str.maketrans("", "", _WHITESPACE + ",")
+_PRICE_CLEAN_TABLE = str.maketrans("", "", _WHITESPACE + ",Rr")
+
 _ERF_RE = re.compile(
     r"\bERF\s*(\d+)\b",
     re.IGNORECASE,
@@ -48,6 +67,7 @@ _DATE_RE = re.compile(
     r"|\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b",
 )
 
+# In priority order: when several appear, the earliest entry wins
 _PROPERTY_TYPE_KEYWORDS: list[tuple[str, str]] = [
     (r"\bsectional\s+title\b", "sectional title"),
     (r"\bapartment\b", "apartment"),
@@ -62,6 +82,13 @@ _PROPERTY_TYPE_KEYWORDS: list[tuple[str, str]] = [
     (r"\bfarm\b", "farm"),
 ]
 
+# All keywords fused into one alternation; group "t<i>" is entry i above
+_PROPERTY_TYPE_RE = re.compile(
+    "|".join(f"(?P<t{i}>{pattern})" for i, (pattern, _) in enumerate(_PROPERTY_TYPE_KEYWORDS)),
+    re.IGNORECASE,
+)
+_PROPERTY_TYPE_RANK: dict[str, int] = {f"t{i}": i for i in range(len(_PROPERTY_TYPE_KEYWORDS))}
+
 # Suburb / town keywords commonly appearing in South African property listings
 _KNOWN_SUBURBS: list[str] = [
     "Roodepoort", "Krugersdorp", "Johannesburg", "Pretoria", "Soweto",
@@ -74,6 +101,24 @@ _KNOWN_SUBURBS: list[str] = [
     "Port Elizabeth", "Gqeberha", "East London", "Bloemfontein",
 ]
 
+# Single-pass suburb scan. The alternation sits in a lookahead so matches may
+# overlap, and the earliest _KNOWN_SUBURBS entry found still wins as before.
+# Group "s<i>" is entry i; ranking on the group rather than the matched text
+# keeps IGNORECASE matches such as "ſoweto" (long s) from missing the lookup.
+_SUBURB_RE = re.compile(
+    "(?="
+    + "|".join(f"(?P<s{i}>{re.escape(s)})" for i, s in enumerate(_KNOWN_SUBURBS))
+    + ")",
+    re.IGNORECASE,
+)
+_SUBURB_RANK: dict[str, int] = {f"s{i}": i for i in range(len(_KNOWN_SUBURBS))}
+
+# Capitalised place name following common address indicators. Case-sensitive
+# on purpose: the capitalisation is what identifies the name.
+_LOCATION_FALLBACK_RE = re.compile(
+    r"(?:situated\s+at|located\s+at|in|at)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)"
+)
+
 
 # ---------------------------------------------------------------------------
 # Parsing helpers
@@ -81,17 +126,15 @@ _KNOWN_SUBURBS: list[str] = [
 
 def _parse_price(text: str) -> float | None:
     """Return the largest Rand amount found (likely the reserve/asking price)."""
-    matches = _PRICE_RE.findall(text)
-    if not matches:
-        return None
-    amounts: list[float] = []
-    for m in matches:
-        digits = re.sub(r"[^\d.]", "", m)
+    best: float | None = None
+    for m in _PRICE_RE.finditer(text):
         try:
-            amounts.append(float(digits))
+            amount = float(m.group().translate(_PRICE_CLEAN_TABLE))
         except ValueError:
-            pass
-    return max(amounts) if amounts else None
+            continue
+        if best is None or amount > best:
+            best = amount
+    return best
 
 
 def _parse_erf(text: str) -> str:
@@ -100,24 +143,31 @@ def _parse_erf(text: str) -> str:
 
 
 def _parse_property_type(text: str) -> str:
-    lower = text.lower()
-    for pattern, label in _PROPERTY_TYPE_KEYWORDS:
-        if re.search(pattern, lower):
-            return label
-    return ""
+    # One pass over the text; the keywords never overlap, so every
+    # occurrence is seen and the highest-priority one can be picked.
+    best: int | None = None
+    for m in _PROPERTY_TYPE_RE.finditer(text):
+        rank = _PROPERTY_TYPE_RANK[m.lastgroup]
+        if best is None or rank < best:
+            best = rank
+            if best == 0:
+                break
+    return _PROPERTY_TYPE_KEYWORDS[best][1] if best is not None else ""
 
 
 def _parse_location(text: str) -> str:
     """Return the first recognised suburb/town found in the text."""
-    lower = text.lower()
-    for suburb in _KNOWN_SUBURBS:
-        if suburb.lower() in lower:
-            return suburb
+    best: int | None = None
+    for m in _SUBURB_RE.finditer(text):
+        rank = _SUBURB_RANK[m.lastgroup]
+        if best is None or rank < best:
+            best = rank
+            if best == 0:
+                break
+    if best is not None:
+        return _KNOWN_SUBURBS[best]
     # Fallback: look for a capitalised word following common address indicators
-    m = re.search(
-        r"(?:situated\s+at|located\s+at|in|at)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",
-        text,
-    )
+    m = _LOCATION_FALLBACK_RE.search(text)
     if m:
         return m.group(1)
     return ""
@@ -162,13 +212,34 @@ def parse_listings(raw_events: list[dict]) -> list[Listing]:
 # Per-property parsing
 # ---------------------------------------------------------------------------
 
-_NO_COURT_RESERVE_RE = re.compile(r'\bNo\s+Court\s+Reserve\b', re.IGNORECASE)
-_BANK_RESERVE_RE = re.compile(r'\bBank\s+Reserve\b', re.IGNORECASE)
-_COURT_RESERVE_RE = re.compile(
-    r'R\s*([\d][\d\s,]*)(?:\.\d+)?\s*(?:\u2013\s*)?Court\s+Reserve',
-    re.IGNORECASE,
+# These run on every property block, so they use RE2 when it is installed.
+# They are written in the syntax subset shared by re and RE2: inline flags,
+# a literal "–"/"²" since RE2 has no \uXXXX, and _WS_CHARS in place of \s
+# because RE2's \s is ASCII-only while PDF text often separates thousands
+# with non-breaking spaces.
+_WS_CHARS = "".join(c if ord(c) > 0x7f else "\\x%02x" % ord(c) for c in _WHITESPACE)
+_WS = f"[{_WS_CHARS}]"
+# RE2's \w, \d and \b are ASCII-only too, so under RE2 they are spelled with
+# the Unicode classes stdlib re uses; "²" and "–" then count the same way
+# (as a word character and a non-word character) on both engines. \b is only
+# used around whole phrases tested with search(), so a consumed boundary
+# character is equivalent.
+if _fast_re is re:
+    _WORD_CHARS, _DIGIT = r"\w", r"\d"
+else:
+    _WORD_CHARS, _DIGIT = r"\pL\pN_", r"\p{Nd}"
+_WORD_START = rf"(?:^|[^{_WORD_CHARS}])"
+_WORD_END = rf"(?:[^{_WORD_CHARS}]|$)"
+
+_NO_COURT_RESERVE_RE = _fast_re.compile(
+    rf'(?i){_WORD_START}No{_WS}+Court{_WS}+Reserve{_WORD_END}'
+)
+_BANK_RESERVE_RE = _fast_re.compile(rf'(?i){_WORD_START}Bank{_WS}+Reserve{_WORD_END}')
+_COURT_RESERVE_RE = _fast_re.compile(
+    rf'(?i)R{_WS}*({_DIGIT}[{_DIGIT}{_WS_CHARS},]*)(?:\.{_DIGIT}+)?{_WS}*(?:' '\u2013'
+    rf'{_WS}*)?Court{_WS}+Reserve'
 )
-_SIZE_RE = re.compile(r'(\d[\d\s]*)m\u00b2', re.IGNORECASE)
+_SIZE_RE = _fast_re.compile(rf'(?i)({_DIGIT}[{_DIGIT}{_WS_CHARS}]*)m' '\u00b2')
 
 # Split on numbered property entries like "1. " or "12. " at start of line
 _PROPERTY_SPLIT_RE = re.compile(r'^(\d{1,2})\.\s', re.MULTILINE)
@@ -181,7 +252,7 @@ _SECTION_END_RE = re.compile(
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class Property:
     sale_date: str          # ISO auction date (YYYY-MM-DD)
     number: int             # property number in PDF
@@ -190,10 +261,16 @@ class Property:
     reserve_price: float | None   # None for Bank / NCR
     reserve_type: str       # 'court' | 'bank' | 'none' | 'unknown'
     pdf_url: str
+    raw_text_lc: str = field(default="", repr=False, compare=False)  # raw_text.lower()
 
     def property_hash(self) -> str:
         key = f"{self.sale_date}|{self.number}|{self.raw_text[:80]}"
-        return hashlib.sha256(key.encode()).hexdigest()
+        return _dedup_hash(key)
+
+    @property
+    def text_lower(self) -> str:
+        """Lower-cased raw_text for keyword matching, precomputed when available."""
+        return self.raw_text_lc or self.raw_text.lower()
 
     @property
     def is_opportunity(self) -> bool:
@@ -214,7 +291,7 @@ def _parse_size(text: str) -> float | None:
     m = _SIZE_RE.search(text)
     if not m:
         return None
-    raw = re.sub(r'\s', '', m.group(1))
+    raw = m.group(1).translate(_WS_TABLE)
     try:
         return float(raw)
     except ValueError:
@@ -229,7 +306,7 @@ def _parse_reserve(text: str) -> tuple[float | None, str]:
         return None, 'bank'
     m = _COURT_RESERVE_RE.search(text)
     if m:
-        raw = re.sub(r'[\s,]', '', m.group(1))
+        raw = m.group(1).translate(_WS_COMMA_TABLE)
         try:
             return float(raw), 'court'
         except ValueError:
@@ -238,7 +315,11 @@ def _parse_reserve(text: str) -> tuple[float | None, str]:
 
 
 def property_from_db(row: dict) -> "Property":
-    """Reconstruct a Property dataclass from a DB row dict."""
+    """
+    Reconstruct a Property dataclass from a DB row dict.
+    Only sale_date and property_number are required, so partial rows such as
+    get_upcoming_properties_summary() results are accepted.
+    """
     return Property(
         sale_date=row["sale_date"],
         number=row["property_number"],
@@ -247,6 +328,7 @@ def property_from_db(row: dict) -> "Property":
         reserve_price=row.get("reserve_price"),
         reserve_type=row.get("reserve_type") or "unknown",
         pdf_url=row.get("pdf_url") or "",
+        raw_text_lc=row.get("raw_text_lc") or "",
     )
 
 
@@ -267,24 +349,18 @@ def parse_pdf_properties(pdf_text: str, sale_date: str, pdf_url: str) -> list[Pr
     if end_m:
         body = body[:end_m.start()]
 
-    # Split on numbered headings
-    parts = _PROPERTY_SPLIT_RE.split(body)
-    # parts pattern after split: [pre, num, block, num, block, ...]
-    # parts[0] is text before first number; skip it
+    # Each numbered heading starts a block that runs to the next heading;
+    # text before the first heading is skipped
+    headings = list(_PROPERTY_SPLIT_RE.finditer(body))
+    ends = [m.start() for m in headings[1:]] + [len(body)]
     properties: list[Property] = []
-    i = 1
-    while i + 1 < len(parts):
-        num_str = parts[i]
-        block = parts[i + 1].strip()
-        i += 2
+    for m, end in zip(headings, ends):
+        block = body[m.end():end].strip()
 
         if len(block) < 20:
             continue
 
-        try:
-            number = int(num_str)
-        except ValueError:
-            continue
+        number = int(m.group(1))
 
         size = _parse_size(block)
         reserve_price, reserve_type = _parse_reserve(block)
@@ -297,6 +373,7 @@ def parse_pdf_properties(pdf_text: str, sale_date: str, pdf_url: str) -> list[Pr
             reserve_price=reserve_price,
             reserve_type=reserve_type,
             pdf_url=pdf_url,
+            raw_text_lc=block.lower(),
         ))
 
     return properties
@@ -9,7 +9,9 @@ The job:
 5. Sends per-property notifications and marks properties as seen.
 """
 
+import asyncio
 import logging
+from bisect import bisect_right
 from datetime import date as _date
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from telegram import Bot
@@ -18,45 +20,152 @@ from config import CHECK_INTERVAL_HOURS
 from database import db
 from scraper.sheroot_scraper import scrape_listings
 from parser.listing_parser import parse_pdf_properties, property_from_db, Property
-from bot.notifications import send_notification
+from bot.notifications import format_property_message, send_notification
+from workers import run_in_process
 
 logger = logging.getLogger(__name__)
 
+# Notifications in flight at once; kept under Telegram's ~30 msg/s global
+# limit, which the application's rate limiter enforces on top of this.
+_SEND_CONCURRENCY = 25
+
 
 # ---------------------------------------------------------------------------
 # Matching logic
 # ---------------------------------------------------------------------------
 
-def _matches_property(prop: Property, pref: dict) -> bool:
+def _normalize_preference(pref: dict) -> dict:
+    """
+    Precompute what matching needs from a preference row: open-ended price
+    bounds become +/-inf and location keywords are lower-cased once.
+    """
+    min_p = pref.get("min_price")
+    max_p = pref.get("max_price")
+    return {
+        "telegram_id": pref.get("telegram_id"),
+        "min": min_p if min_p is not None else float("-inf"),
+        "max": max_p if max_p is not None else float("inf"),
+        "kws_lc": tuple(kw.lower() for kw in pref.get("location_keywords") or ()),
+    }
+
+
+def _matches_property_fast(prop: Property, normalized: dict, text_lower: str) -> bool:
     """
-    Return True if the property satisfies the user's preference.
-    NCR and Bank Reserve properties always match (bypass price filter).
+    Return True if the property satisfies a preference already passed through
+    _normalize_preference(), by the rules in CLAUDE.md "Matching Logic": NCR
+    and Bank Reserve properties always match. text_lower is prop.text_lower,
+    read once per property by the caller.
     """
     # Opportunities always go through
     if prop.is_opportunity:
         return True
 
-    # Price check
-    if prop.reserve_price is not None:
-        min_p = pref.get("min_price")
-        max_p = pref.get("max_price")
-        if min_p is not None and prop.reserve_price < min_p:
-            return False
-        if max_p is not None and prop.reserve_price > max_p:
-            return False
-    # If no price found, allow through
+    # Price check — if no price found, allow through
+    price = prop.reserve_price
+    if price is not None and not (normalized["min"] <= price <= normalized["max"]):
+        return False
 
     # Location keyword check
-    keywords: list[str] = pref.get("location_keywords") or []
-    if keywords:
-        text_lower = prop.raw_text.lower()
-        matched = any(kw.lower() in text_lower for kw in keywords)
-        if not matched:
-            return False
+    keywords = normalized["kws_lc"]
+    if keywords and not any(kw in text_lower for kw in keywords):
+        return False
 
     return True
 
 
+def _index_preferences(normalized_prefs: list[dict]) -> dict:
+    """
+    Partition normalised preferences once per job so each property only pays
+    for the checks that can fail:
+      always     — no keywords and no price bounds: match everything
+      price_only — no keywords; sorted by lower bound (price_mins) so the
+                   candidates for a price are a bisected prefix
+      keyword    — have keywords; each distinct keyword maps to the positions
+                   of the preferences using it, so it is searched for once
+    """
+    always: list[dict] = []
+    price_only: list[dict] = []
+    keyword_prefs: list[dict] = []
+    keyword_index: dict[str, list[int]] = {}
+    for pref in normalized_prefs:
+        if pref["kws_lc"]:
+            for kw in pref["kws_lc"]:
+                keyword_index.setdefault(kw, []).append(len(keyword_prefs))
+            keyword_prefs.append(pref)
+        elif pref["min"] == float("-inf") and pref["max"] == float("inf"):
+            always.append(pref)
+        else:
+            price_only.append(pref)
+    price_only.sort(key=lambda p: p["min"])
+    return {
+        "all": normalized_prefs,
+        "always": always,
+        "price_only": price_only,
+        "price_mins": [p["min"] for p in price_only],
+        "keyword_prefs": keyword_prefs,
+        "keyword_index": keyword_index,
+    }
+
+
+def _matching_preferences(prop: Property, index: dict, text_lower: str) -> list[dict]:
+    """
+    Return the normalised preferences prop satisfies — the CLAUDE.md
+    "Matching Logic" rules, as in _matches_property_fast(), evaluated per
+    _index_preferences() partition.
+    """
+    # Opportunities always go through
+    if prop.is_opportunity:
+        return index["all"]
+
+    price = prop.reserve_price
+    matched = list(index["always"])
+
+    # Price check — if no price found, allow through
+    if price is None:
+        matched.extend(index["price_only"])
+    else:
+        upto = bisect_right(index["price_mins"], price)
+        matched.extend(p for p in index["price_only"][:upto] if price <= p["max"])
+
+    # Location keyword check
+    keyword_hits: set[int] = set()
+    for kw, positions in index["keyword_index"].items():
+        if kw in text_lower:
+            keyword_hits.update(positions)
+    keyword_prefs = index["keyword_prefs"]
+    for i in sorted(keyword_hits):
+        pref = keyword_prefs[i]
+        if price is None or pref["min"] <= price <= pref["max"]:
+            matched.append(pref)
+
+    return matched
+
+
+# ---------------------------------------------------------------------------
+# PDF parsing
+# ---------------------------------------------------------------------------
+
+async def parse_events_properties(events: list[dict]) -> list[list[Property]]:
+    """
+    Parse each event's PDF text into Property objects, returning one list per
+    event in the same order. Parsing is CPU-bound, so several events are
+    spread over the shared worker pool; events without PDF text, or a lone
+    event, are parsed inline where a round-trip to a worker would cost more.
+    """
+    jobs = [
+        (e.get("pdf_text", ""), e.get("date", ""), e.get("pdf_url", ""))
+        for e in events
+    ]
+    texts = [job for job in jobs if job[0]]
+    if len(texts) <= 1:
+        return [parse_pdf_properties(*job) for job in jobs]
+
+    parsed = iter(await asyncio.gather(*(
+        run_in_process(len(texts), parse_pdf_properties, *job) for job in texts
+    )))
+    return [next(parsed) if job[0] else [] for job in jobs]
+
+
 # ---------------------------------------------------------------------------
 # Core scrape-and-notify job
 # ---------------------------------------------------------------------------
@@ -81,56 +190,82 @@ async def scrape_and_notify(bot: Bot):
     logger.info("Raw events returned: %d", len(raw_events))
 
     users = {u["telegram_id"]: dict(u) for u in db.get_all_users()}
-    preferences = db.get_all_active_preferences()
-
-    total_new = 0
-
-    for event in raw_events:
-        sale_date = event.get("date", "")
-
-        if sale_date in cached_dates:
-            # Load properties from DB cache instead of re-parsing
-            cached_rows = [
-                r for r in db.get_upcoming_properties(today)
-                if r["sale_date"] == sale_date
-            ]
-            properties = [property_from_db(r) for r in cached_rows]
-            logger.info("Event '%s' (%s): using %d cached properties from DB",
-                        event.get("title"), sale_date, len(properties))
-        else:
-            pdf_text = event.get("pdf_text", "")
-            pdf_url = event.get("pdf_url", "")
-            properties = parse_pdf_properties(pdf_text, sale_date, pdf_url)
-            logger.info("Event '%s' (%s): parsed %d properties from PDF",
-                        event.get("title"), sale_date, len(properties))
-            for prop in properties:
-                db.upsert_property(prop)
+    preferences = [_normalize_preference(p) for p in db.get_all_active_preferences()]
+    preference_index = _index_preferences(preferences)
+
+    # One read of the seen set up front and one batched write at the end,
+    # rather than a DB round-trip per property
+    seen = db.get_all_seen_hashes()
+    newly_seen: list[str] = []
 
-        for prop in properties:
-            h = prop.property_hash()
-            if db.is_listing_seen(h):
-                continue
+    send_slots = asyncio.Semaphore(_SEND_CONCURRENCY)
 
-            notified: set[int] = set()
+    async def _send(chat_id: int, prop: Property, message: str) -> bool:
+        async with send_slots:
+            return await send_notification(bot, chat_id, prop, message)
 
-            if not preferences:
-                # No prefs: send to all registered users
-                for tid, user in users.items():
-                    await send_notification(bot, user["chat_id"], prop)
-                    notified.add(tid)
+    # Parse every uncached event's PDF up front, in parallel; results are
+    # consumed below in the same order.
+    parsed = iter(await parse_events_properties(
+        [e for e in raw_events if e.get("date", "") not in cached_dates]
+    ))
+
+    # Cached properties are loaded once and grouped by sale date
+    cached_by_date: dict[str, list] = {}
+    if cached_dates:
+        for r in db.get_upcoming_properties(today):
+            cached_by_date.setdefault(r["sale_date"], []).append(r)
+
+    try:
+        for event in raw_events:
+            sale_date = event.get("date", "")
+
+            if sale_date in cached_dates:
+                # Load properties from DB cache instead of re-parsing
+                cached_rows = cached_by_date.get(sale_date, [])
+                properties = [property_from_db(r) for r in cached_rows]
+                logger.info("Event '%s' (%s): using %d cached properties from DB",
+                            event.get("title"), sale_date, len(properties))
             else:
-                for pref in preferences:
-                    if _matches_property(prop, pref):
+                properties = next(parsed)
+                logger.info("Event '%s' (%s): parsed %d properties from PDF",
+                            event.get("title"), sale_date, len(properties))
+                db.upsert_properties_bulk(properties)
+
+            # Sends for the whole event are queued here and awaited together
+            sends = []
+            for prop in properties:
+                h = prop.property_hash()
+                if h in seen:
+                    continue
+
+                notified: set[int] = set()
+                # Format once, reuse for every recipient
+                message = format_property_message(prop)
+                text_lower = prop.text_lower
+
+                if not preferences:
+                    # No prefs: send to all registered users
+                    for tid, user in users.items():
+                        sends.append(_send(user["chat_id"], prop, message))
+                        notified.add(tid)
+                else:
+                    for pref in _matching_preferences(prop, preference_index, text_lower):
                         user = users.get(pref["telegram_id"])
                         if user and pref["telegram_id"] not in notified:
-                            await send_notification(bot, user["chat_id"], prop)
+                            sends.append(_send(user["chat_id"], prop, message))
                             notified.add(pref["telegram_id"])
 
-            if notified:
-                db.mark_listing_seen(h)
-                total_new += 1
+                if notified:
+                    seen.add(h)
+                    newly_seen.append(h)
+
+            await asyncio.gather(*sends)
+    finally:
+        # Persist whatever was sent even if a later event fails
+        db.mark_listings_seen(newly_seen)
 
-    logger.info("Scrape job done. New properties notified: %d", total_new)
+    logger.info("Scrape job done. New properties notified: %d", len(newly_seen))
 
 
 # ---------------------------------------------------------------------------
@@ -6,28 +6,60 @@ Strategy: Intercept the Inffuse calendar API response
 that is fired by the embed.js widget on the Sheroot page.
 The response contains structured JSON event data at
   response["project"]["data"]["events"]
+Once the API URL has been seen it is requested directly on later runs, and
+the browser is only started again if that call fails.
 
 Each event may also link to a detail/list page (e.g. sheroot.co.za/Listfixed1)
-whose text is fetched and appended to the raw_text for downstream parsing.
+whose text is fetched over plain HTTP and appended to the raw_text for
+downstream parsing.
 """
 
 import asyncio
 import io
 import logging
 import re
+import time
 from datetime import datetime, timezone
 
 import pdfplumber
+from bs4 import BeautifulSoup
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
+from parser.listing_parser import _SECTION_END_RE, _SECTION_START_RE
+from workers import run_in_process
+
 logger = logging.getLogger(__name__)
 
 SHEROOT_URL = "https://www.sheroot.co.za/fixed-property-sales.html"
 CALENDAR_API_PATH = "inffuse.eventscalendar.co/js/v0.1/calendar/data"
 SHEROOT_BASE = "https://www.sheroot.co.za"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+# Chromium launch options; the deployment target only has the system build.
+# Shared with test_scraper.py's persistent context so the two cannot drift.
+BROWSER_LAUNCH_OPTIONS = {
+    "headless": True,
+    "executable_path": "/usr/bin/chromium-browser",
+}
+
+# List pages fetched at once; keeps the load on sheroot.co.za modest
+LIST_FETCH_CONCURRENCY = 4
 
 _PDF_LINK_RE = re.compile(r'href=["\']([^"\']+\.pdf)["\']', re.IGNORECASE)
 
+# Calendar data URL (and the referer/origin it was sent with) as last seen by
+# the browser. embed.js builds the URL from its page config, so it is learnt
+# once from a real page load and then requested directly on later runs.
+# The URL may carry a date window or instance token, so it is only reused for
+# CALENDAR_API_URL_TTL seconds before the page is loaded again.
+CALENDAR_API_URL_TTL = 3 * 24 * 3600
+_calendar_api_url: str | None = None
+_calendar_api_headers: dict[str, str] = {}
+_calendar_api_captured_at = 0.0
+
 
 def _ms_to_iso(ms: int) -> str:
     """Convert millisecond epoch to ISO date string (YYYY-MM-DD)."""
@@ -37,29 +69,74 @@ def _ms_to_iso(ms: int) -> str:
         return ""
 
 
+def _event_start_date(ev: dict) -> str:
+    """ISO start date of a calendar API event."""
+    return ev.get("startDate") or _ms_to_iso(ev.get("start", 0))
+
+
+def _has_upcoming_events(events: list, today) -> bool:
+    """True if any event is on or after today (undated events count)."""
+    for ev in events:
+        try:
+            if datetime.strptime(_event_start_date(ev), "%Y-%m-%d").date() >= today:
+                return True
+        except (ValueError, TypeError):
+            return True
+    return False
+
+
 def _extract_pdf_text(pdf_bytes: bytes) -> str:
-    """Extract all text from a PDF given its raw bytes."""
+    """
+    Extract the text from a PDF given its raw bytes.
+    Pages after the end of the properties section (the sale rules and other
+    boilerplate that parse_pdf_properties() discards) are not extracted.
+    """
     try:
         with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
             pages_text = []
+            in_section = False
+            pages_read = 0
             for i, p in enumerate(pdf.pages, 1):
+                pages_read = i
                 text = p.extract_text() or ""
                 if text.strip():
                     pages_text.append(f"[Page {i}]\n{text}")
+                # Same rule as parse_pdf_properties(): the end marker only
+                # counts once it follows the start marker.
+                section = text
+                if not in_section:
+                    start_m = _SECTION_START_RE.search(text)
+                    if start_m:
+                        in_section = True
+                        section = text[start_m.end():]
+                if in_section and _SECTION_END_RE.search(section):
+                    break
             result = "\n\n".join(pages_text)
-            logger.info("PDF extracted: %d page(s), %d chars", len(pdf.pages), len(result))
+            logger.info("PDF extracted: %d of %d page(s), %d chars",
+                        pages_read, len(pdf.pages), len(result))
             return result
     except Exception as exc:
         logger.warning("PDF extraction failed: %s", exc)
         return ""
 
 
-async def _fetch_list_page(page, url: str) -> tuple[str, str]:
+def _html_body_text(html: str) -> str:
+    """Visible text of an HTML page's body, one block per line."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    body = soup.body or soup
+    return body.get_text("\n", strip=True)
+
+
+async def _fetch_list_page(request_context, url: str) -> tuple[str, str, bytes]:
     """
-    Navigate to a listing detail URL.
-    If the page contains a PDF download link, download and extract the PDF text.
-    Otherwise return the page body text.
-    Returns (text, pdf_url) — pdf_url is "" if no PDF was found.
+    Fetch a listing detail URL over plain HTTP — the PDF link is in the
+    served HTML, so no page rendering is needed.
+    If the page contains a PDF download link, download the PDF and return its
+    raw bytes for the caller to extract. Otherwise return the page body text.
+    Returns (text, pdf_url, pdf_bytes) — pdf_url is "" and pdf_bytes is b""
+    if no PDF was found.
     """
     if not url.startswith("http"):
         if url.startswith("www."):
@@ -67,12 +144,14 @@ async def _fetch_list_page(page, url: str) -> tuple[str, str]:
         else:
             url = SHEROOT_BASE + "/" + url.lstrip("/")
     try:
-        new_page = await page.context.new_page()
-        await new_page.goto(url, timeout=30_000, wait_until="domcontentloaded")
-        await asyncio.sleep(2)
+        response = await request_context.get(url, timeout=30_000)
+        if not response.ok:
+            # List pages 404 until they are published close to the sale date
+            logger.info("List page not available: HTTP %s for %s", response.status, url)
+            return "", "", b""
 
         # Check for a PDF download link in the page HTML
-        html = await new_page.content()
+        html = await response.text()
         pdf_match = _PDF_LINK_RE.search(html)
 
         if pdf_match:
@@ -81,154 +160,258 @@ async def _fetch_list_page(page, url: str) -> tuple[str, str]:
                 pdf_href = SHEROOT_BASE + "/" + pdf_href.lstrip("/")
             logger.info("Found PDF link on list page: %s", pdf_href)
 
-            # Download the PDF via the existing browser context (carries cookies/session)
-            response = await new_page.context.request.get(pdf_href)
+            # Same request context, so any cookies set by the list page are sent
+            response = await request_context.get(pdf_href)
             if response.ok:
                 pdf_bytes = await response.body()
                 logger.info("Downloaded PDF: %d bytes", len(pdf_bytes))
-                await new_page.close()
-                return _extract_pdf_text(pdf_bytes), pdf_href
+                return "", pdf_href, pdf_bytes
             else:
                 logger.warning("PDF download failed: HTTP %s for %s", response.status, pdf_href)
 
         # Fallback: return plain body text
-        text = await new_page.inner_text("body")
-        await new_page.close()
-        return text.strip(), ""
+        return _html_body_text(html), "", b""
 
     except Exception as exc:
         logger.warning("Could not fetch list page %s: %s", url, exc)
-        return "", ""
+        return "", "", b""
 
 
-async def scrape_listings(skip_dates: set | None = None) -> list[dict]:
-    """
-    Returns a list of raw event dicts scraped from Sheroot.
-    Each dict has keys: title, date, description, raw_text, links, event_id,
-    pdf_text, pdf_url.
+async def _launch_browser(pw):
+    """Start headless Chromium and return (browser, context)."""
+    browser = await pw.chromium.launch(**BROWSER_LAUNCH_OPTIONS)
+    context = await browser.new_context(user_agent=USER_AGENT)
+    return browser, context
 
-    skip_dates: sale dates already cached in DB — PDF download is skipped for
-    these dates (pdf_text and pdf_url will be empty strings in the returned dict).
+
+async def _capture_calendar_data(context) -> dict | None:
     """
-    all_events: list[dict] = []
+    Load the Sheroot page in the browser and intercept the calendar API
+    response. The API URL and its referer/origin headers are remembered so
+    later runs can request it directly.
+    """
+    global _calendar_api_url, _calendar_api_headers, _calendar_api_captured_at
+
+    page = await context.new_page()
+    logger.info("Loading Sheroot page: %s", SHEROOT_URL)
+    try:
+        # Resolves as soon as embed.js fires the API call, rather than waiting
+        # for networkidle plus a fixed delay
+        async with page.expect_response(
+            lambda r: CALENDAR_API_PATH in r.url, timeout=60_000
+        ) as resp_info:
+            await page.goto(SHEROOT_URL, timeout=60_000, wait_until="domcontentloaded")
+        resp = await resp_info.value
+    except PlaywrightTimeout:
+        logger.error("Timed out waiting for the calendar API on %s", SHEROOT_URL)
+        await page.close()
+        return None
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(
-            headless=True,
-            executable_path="/usr/bin/chromium-browser",
+    try:
+        calendar_data = await resp.json()
+        logger.info("Intercepted calendar data API: %s", resp.url)
+    except Exception as exc:
+        logger.error("Failed to parse calendar JSON: %s", exc)
+        return None
+    finally:
+        await page.close()
+
+    _calendar_api_url = resp.url
+    _calendar_api_captured_at = time.monotonic()
+    _calendar_api_headers = {
+        k: v for k, v in resp.request.headers.items()
+        if k in ("referer", "origin")
+    }
+    return calendar_data
+
+
+async def _fetch_calendar_data_direct(request_context) -> dict | None:
+    """
+    Request the calendar API URL captured on an earlier run without loading
+    the page. Returns None if no URL is known yet, it is older than
+    CALENDAR_API_URL_TTL, or the response no longer has the expected shape or
+    any upcoming event, so the caller can fall back to the browser.
+    """
+    if not _calendar_api_url:
+        return None
+    if time.monotonic() - _calendar_api_captured_at > CALENDAR_API_URL_TTL:
+        logger.info("Captured calendar API URL has expired; reloading the page")
+        return None
+    try:
+        response = await request_context.get(
+            _calendar_api_url, headers=_calendar_api_headers, timeout=30_000
         )
-        context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
+        if response.ok:
+            data = await response.json()
+            events = data.get("project", {}).get("data", {}).get("events")
+            if isinstance(events, list):
+                today = datetime.now(tz=timezone.utc).date()
+                if _has_upcoming_events(events, today):
+                    logger.info("Fetched calendar data API directly: %s", _calendar_api_url)
+                    return data
+                logger.warning("Direct calendar API call returned no upcoming events")
+                return None
+        logger.warning("Direct calendar API call unusable (HTTP %s)", response.status)
+    except Exception as exc:
+        logger.warning("Direct calendar API call failed: %s", exc)
+    return None
+
+
+async def _scrape_events(
+    request_context, capture_calendar, skip_dates: set | None
+) -> list[dict]:
+    """
+    Body of scrape_listings(): fetch the calendar (directly when possible,
+    else via capture_calendar()), then every event's list pages through
+    request_context, extracting PDFs in the shared worker pool.
+    """
+    all_events: list[dict] = []
+    # (event, description_parts, list page fetch tasks in link order)
+    pending: list[tuple[dict, list[str], list[asyncio.Task]]] = []
+    fetch_slots = asyncio.Semaphore(LIST_FETCH_CONCURRENCY)
+    # Every list fetch is queued before the first one completes, and each
+    # yields at most one PDF, so this bounds the PDFs to extract
+    list_fetch_count = 0
+
+    async def fetch_list(link_url: str) -> tuple[str, str]:
+        async with fetch_slots:
+            logger.info("Fetching linked list page: %s", link_url)
+            list_text, pdf_url, pdf_bytes = await _fetch_list_page(
+                request_context, link_url
             )
-        )
-        page = await context.new_page()
+        if pdf_bytes:
+            list_text = await run_in_process(list_fetch_count, _extract_pdf_text, pdf_bytes)
+        return list_text, pdf_url
 
-        calendar_data: dict | None = None
+    calendar_data = await _fetch_calendar_data_direct(request_context)
+    if calendar_data is None:
+        # A browser is only needed to (re)discover the API URL
+        calendar_data = await capture_calendar()
 
-        async def on_response(resp):
-            nonlocal calendar_data
-            if CALENDAR_API_PATH in resp.url:
-                try:
-                    calendar_data = await resp.json()
-                    logger.info("Intercepted calendar data API: %s", resp.url)
-                except Exception as exc:
-                    logger.error("Failed to parse calendar JSON: %s", exc)
+    if not calendar_data:
+        logger.warning("Calendar API response not captured. No events returned.")
+        return all_events
+
+    raw_events = (
+        calendar_data.get("project", {})
+        .get("data", {})
+        .get("events", [])
+    )
+    logger.info("Events found in API response: %d", len(raw_events))
 
-        page.on("response", on_response)
+    today = datetime.now(tz=timezone.utc).date()
 
-        logger.info("Loading Sheroot page: %s", SHEROOT_URL)
+    for ev in raw_events:
+        title = ev.get("title", "")
+        start_date = _event_start_date(ev)
+
+        # Skip events that have already passed
         try:
-            await page.goto(SHEROOT_URL, timeout=60_000, wait_until="networkidle")
-        except PlaywrightTimeout:
-            logger.error("Timed out loading %s", SHEROOT_URL)
-            await browser.close()
-            return all_events
-
-        # Give embed.js time to fire the API call
-        await asyncio.sleep(5)
-
-        if not calendar_data:
-            logger.warning("Calendar API response not captured. No events returned.")
-            await browser.close()
-            return all_events
-
-        raw_events = (
-            calendar_data.get("project", {})
-            .get("data", {})
-            .get("events", [])
-        )
-        logger.info("Events found in API response: %d", len(raw_events))
+            event_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+            if event_date < today:
+                logger.info("Skipping past event '%s' on %s", title, start_date)
+                continue
+        except (ValueError, TypeError):
+            pass  # If date can't be parsed, include the event anyway
+        location = ev.get("location", "")
+        event_id = ev.get("id", "")
+        links = ev.get("links", [])
+
+        # Build base description from calendar fields
+        start_hour = ev.get("startHour", 0)
+        start_min = ev.get("startMinutes", 0)
+        end_hour = ev.get("endHour", 0)
+        end_min = ev.get("endMinutes", 0)
+        time_str = f"{start_hour:02d}:{start_min:02d} – {end_hour:02d}:{end_min:02d}"
+
+        description_parts = [
+            f"Title: {title}",
+            f"Date: {start_date}",
+            f"Time: {time_str}",
+            f"Location: {location}",
+        ]
+
+        # Fetch linked list pages for property detail text; all
+        # events' pages are fetched concurrently
+        # Skip if this date is already cached in the DB
+        fetches: list[asyncio.Task] = []
+        if skip_dates and start_date in skip_dates:
+            logger.info("Skipping PDF fetch for cached date %s", start_date)
+        else:
+            for link in links:
+                link_url = link.get("url", "")
+                if link_url:
+                    fetches.append(asyncio.create_task(fetch_list(link_url)))
+                    list_fetch_count += 1
+
+        event = {
+            "title": title,
+            "date": start_date,
+            "links": links,
+            "event_id": event_id,
+            "location": location,
+            "pdf_text": "",
+            "pdf_url": "",
+        }
+        all_events.append(event)
+        pending.append((event, description_parts, fetches))
+
+    # Collect the results, appending list texts in link order. A failed
+    # fetch or extraction only costs that link, not the whole scrape.
+    for event, description_parts, fetches in pending:
+        for result in await asyncio.gather(*fetches, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning("List page for '%s' failed: %s", event["title"], result)
+                continue
+            list_text, found_pdf_url = result
+            if list_text:
+                description_parts.append(f"\n--- Property List ---\n{list_text}")
+                event["pdf_text"] = list_text
+            if found_pdf_url:
+                event["pdf_url"] = found_pdf_url
+        raw_text = "\n".join(description_parts)
+        event["description"] = raw_text
+        event["raw_text"] = raw_text
 
-        today = datetime.now(tz=timezone.utc).date()
+    return all_events
 
-        for ev in raw_events:
-            title = ev.get("title", "")
-            start_date = ev.get("startDate") or _ms_to_iso(ev.get("start", 0))
 
-            # Skip events that have already passed
-            try:
-                event_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-                if event_date < today:
-                    logger.info("Skipping past event '%s' on %s", title, start_date)
-                    continue
-            except (ValueError, TypeError):
-                pass  # If date can't be parsed, include the event anyway
-            location = ev.get("location", "")
-            event_id = ev.get("id", "")
-            links = ev.get("links", [])
-
-            # Build base description from calendar fields
-            start_hour = ev.get("startHour", 0)
-            start_min = ev.get("startMinutes", 0)
-            end_hour = ev.get("endHour", 0)
-            end_min = ev.get("endMinutes", 0)
-            time_str = f"{start_hour:02d}:{start_min:02d} – {end_hour:02d}:{end_min:02d}"
-
-            description_parts = [
-                f"Title: {title}",
-                f"Date: {start_date}",
-                f"Time: {time_str}",
-                f"Location: {location}",
-            ]
-
-            # Fetch linked list pages for property detail text
-            # Skip if this date is already cached in the DB
-            pdf_text = ""
-            pdf_url = ""
-            if skip_dates and start_date in skip_dates:
-                logger.info("Skipping PDF fetch for cached date %s", start_date)
-            else:
-                for link in links:
-                    link_url = link.get("url", "")
-                    if link_url:
-                        logger.info("Fetching linked list page: %s", link_url)
-                        list_text, found_pdf_url = await _fetch_list_page(page, link_url)
-                        if list_text:
-                            description_parts.append(f"\n--- Property List ---\n{list_text}")
-                            pdf_text = list_text
-                        if found_pdf_url:
-                            pdf_url = found_pdf_url
-
-            raw_text = "\n".join(description_parts)
-
-            all_events.append(
-                {
-                    "title": title,
-                    "date": start_date,
-                    "description": raw_text,
-                    "raw_text": raw_text,
-                    "links": links,
-                    "event_id": event_id,
-                    "location": location,
-                    "pdf_text": pdf_text,
-                    "pdf_url": pdf_url,
-                }
-            )
+async def scrape_listings(skip_dates: set | None = None, context=None) -> list[dict]:
+    """
+    Returns a list of raw event dicts scraped from Sheroot.
+    Each dict has keys: title, date, description, raw_text, links, event_id,
+    pdf_text, pdf_url.
+
+    skip_dates: sale dates already cached in DB — PDF download is skipped for
+    these dates (pdf_text and pdf_url will be empty strings in the returned dict).
 
-        await browser.close()
+    context: an open Playwright BrowserContext to reuse, e.g. a persistent one
+    shared across runs. Its request client and pages are used and it is left
+    open. Without one, Playwright is started for this call and Chromium only
+    if the calendar API URL has to be rediscovered.
+    """
+    # PDF extraction is CPU-bound pure Python; each download is handed to a
+    # worker process straight away so parsing overlaps the remaining fetches.
+    if context is not None:
+        all_events = await _scrape_events(
+            context.request, lambda: _capture_calendar_data(context), skip_dates
+        )
+    else:
+        async with async_playwright() as pw:
+            async def capture_calendar():
+                browser, browser_context = await _launch_browser(pw)
+                try:
+                    return await _capture_calendar_data(browser_context)
+                finally:
+                    await browser.close()
+
+            request_context = await pw.request.new_context(user_agent=USER_AGENT)
+            try:
+                all_events = await _scrape_events(
+                    request_context, capture_calendar, skip_dates
+                )
+            finally:
+                await request_context.dispose()
 
     logger.info("Total events scraped: %d", len(all_events))
     return all_events
@@ -3,9 +3,12 @@ Test clicking the Feb 27 calendar event to see what page/file loads.
 Intercepts all responses so we can tell if it opens HTML or a PDF.
 """
 import asyncio
+import os
+import re
 import sys
 import logging
 from playwright.async_api import async_playwright
+from scraper.sheroot_scraper import USER_AGENT
 
 sys.stdout.reconfigure(encoding="utf-8")
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
@@ -13,157 +16,300 @@ logger = logging.getLogger(__name__)
 
 SHEROOT_URL = "https://www.sheroot.co.za/fixed-property-sales.html"
 TARGET_DATE = "27"  # Feb 27 event
+MAX_RESPONSES_KEPT = 500
+# How long after the click a new tab may take to open
+NEW_TAB_TIMEOUT_MS = 10_000
+
+# Responses worth logging: Sheroot / list pages, and PDFs by URL
+_SITE_URL_RE = re.compile(r"sheroot|listfixed", re.IGNORECASE)
+_PDF_URL_RE = re.compile(r"\.pdf$", re.IGNORECASE)
+# DEBUG=1 (or true/yes) shows the browser window
+DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true", "yes")
+
+# The test only reads DOM text and response metadata, so nothing that is
+# merely rendered (or tracks the visit) needs to be fetched
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+)
+
+
+# Event card selectors, most specific first
+EVENT_SELECTORS = ["text=Sale in Execution", "text=Sale"]
+# How long a more specific selector may still resolve after a generic one has
+SELECTOR_GRACE_S = 0.5
+# First n characters of the body's textContent — no layout pass, unlike
+# inner_text(), and only the logged slice crosses CDP
+BODY_TEXT_JS = "n => document.body?.textContent?.slice(0, n) ?? ''"
+# Truthy once the widget has mounted #root, in its shadow root or light DOM
+ROOT_MOUNTED_JS = (
+    "() => { const r = document.querySelector('#root');"
+    " return !!r && !!(r.shadowRoot || r.firstElementChild); }"
+)
+# Resolves the calendar root once onto window.__root__ — the shadow root
+# when there is one, else the plain body — and reports which it found
+RESOLVE_ROOT_JS = """() => {
+    const shadow = document.querySelector('#root')?.shadowRoot ?? null;
+    window.__root__ = shadow ?? document.body;
+    return shadow !== null;
+}"""
+# Truthy once the calendar's React app has rendered an event card
+EVENTS_RENDERED_JS = "() => window.__root__?.querySelector('[class*=\"event\"]')"
+# Elements that can hold the event's detail popup ("detail" also covers
+# "event-detail"); passed to the page as an argument, never re-spelled in JS
+POPUP_SEL = '[class*="popup"],[class*="modal"],[class*="detail"],[class*="popover"]'
+# Truthy once clicking a card has opened its detail popup (uses the root
+# cached on window.__root__)
+POPUP_OPEN_JS = "sel => window.__root__?.querySelector(sel)"
+
+
+async def _block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        host in request.url for host in BLOCKED_HOSTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
 
 
 async def test_click():
     async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=False)  # visible so we can see what happens
+        browser = await pw.chromium.launch(
+            headless=not DEBUG,
+            args=[
+                "--disable-gpu",
+                "--disable-dev-shm-usage",
+                "--no-sandbox",
+                "--disable-blink-features=AutomationControlled",
+            ],
+        )
         context = await browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            )
+            user_agent=USER_AGENT,
+            # Tall enough that the calendar iframe is rendered on first paint
+            viewport={"width": 1024, "height": 1400},
         )
+        # Routed on the context so new tabs opened by the click are covered too
+        await context.route("**/*", _block_heavy_resources)
         page = await context.new_page()
 
-        # Track all responses
+        # Track Sheroot/Listfixed/PDF responses, filtered as they arrive. The
+        # listener is on the context so the tab the click opens (the list
+        # page and its PDF) is covered from its first response
         responses_seen = []
 
         async def on_response(resp):
             url = resp.url
             ct = resp.headers.get("content-type", "")
-            responses_seen.append((url, ct, resp.status))
-            if "pdf" in ct.lower() or url.lower().endswith(".pdf"):
+            ct_pdf = "pdf" in ct.lower()
+            site = _SITE_URL_RE.search(url)
+            pdf = ct_pdf or _PDF_URL_RE.search(url)
+            if not (site or pdf):
+                return
+            if (site or ct_pdf) and len(responses_seen) < MAX_RESPONSES_KEPT:
+                responses_seen.append((url, ct, resp.status))
+            if pdf:
                 logger.info("PDF RESPONSE: %s  content-type=%s", url, ct)
-            elif "Listfixed" in url or "sheroot" in url.lower():
+            else:
                 logger.info("Sheroot response: %s  status=%s  content-type=%s", url, resp.status, ct)
 
-        page.on("response", on_response)
+        context.on("response", on_response)
 
-        # Also track new pages opened (newtab links)
-        new_pages = []
+        try:
+            await _inspect_calendar(page, responses_seen)
+        finally:
+            # Drop the listener so Playwright releases the response objects
+            context.remove_listener("response", on_response)
+            await browser.close()
 
-        async def on_page(new_page):
-            logger.info("NEW TAB opened: %s", new_page.url)
-            new_pages.append(new_page)
-            new_page.on("response", on_response)
 
-        context.on("page", on_page)
+async def _inspect_calendar(page, responses_seen):
+    """Load the page, click the sale event and log what it renders or opens."""
+    logger.info("Loading Sheroot page...")
+    await page.goto(SHEROOT_URL, timeout=60_000, wait_until="domcontentloaded")
 
-        logger.info("Loading Sheroot page...")
-        await page.goto(SHEROOT_URL, timeout=60_000, wait_until="networkidle")
+    # The viewport already has the iframe above the fold, so the widget
+    # mounts without scrolling; just wait for the frame to attach
+    try:
+        await page.wait_for_selector("iframe", state="attached", timeout=30_000)
+    except Exception as e:
+        logger.warning("No iframe attached: %s", e)
 
-        # Scroll to the iframe to trigger lazy rendering
-        iframe_el = await page.query_selector("iframe")
-        if iframe_el:
-            await iframe_el.scroll_into_view_if_needed()
-            logger.info("Scrolled to iframe.")
-        await asyncio.sleep(10)  # give React more time to render
+    # Find the iframe
+    frames = page.frames
+    logger.info("Frames on page: %d", len(frames))
+    iframe = None
+    for f in frames:
+        logger.info("  Frame URL: %s", f.url)
+        if iframe is None and ("inffuse" in f.url or "calendar" in f.url.lower()):
+            iframe = f
+    if not iframe:
+        logger.warning("Could not find Inffuse iframe. Trying all frames...")
+        iframe = frames[1] if len(frames) > 1 else None
 
-        # Find the iframe
-        frames = page.frames
-        logger.info("Frames on page: %d", len(frames))
-        for f in frames:
-            logger.info("  Frame URL: %s", f.url)
+    if not iframe:
+        logger.error("No iframe found.")
+        return
 
-        iframe = next(
-            (f for f in frames if "inffuse" in f.url or "calendar" in f.url.lower()),
-            None,
-        )
-        if not iframe:
-            logger.warning("Could not find Inffuse iframe. Trying all frames...")
-            iframe = frames[1] if len(frames) > 1 else None
+    logger.info("Using iframe: %s", iframe.url)
 
-        if not iframe:
-            logger.error("No iframe found.")
-            await browser.close()
-            return
+    # Wait for the widget to mount, then probe for a shadow root once;
+    # every later evaluate reads window.__root__ instead of re-walking
+    # #root, and the shadow-only steps are skipped when there is none
+    has_shadow = False
+    try:
+        await iframe.wait_for_function(ROOT_MOUNTED_JS, timeout=15_000)
+        has_shadow = await iframe.evaluate(RESOLVE_ROOT_JS)
+    except Exception as e:
+        logger.warning("Could not resolve calendar root: %s", e)
+    if not has_shadow:
+        logger.info("No shadow root on #root; using the plain DOM")
 
-        logger.info("Using iframe: %s", iframe.url)
+    # Wait for React to render the calendar instead of a fixed sleep
+    try:
+        await iframe.wait_for_function(EVENTS_RENDERED_JS, timeout=15_000)
+    except Exception as e:
+        logger.warning("Calendar events did not render: %s", e)
 
-        # Dump full iframe body text to see what's rendered
-        try:
-            body_text = await iframe.inner_text("body")
-            logger.info("Iframe body text (first 1000 chars):\n%s", body_text[:1000])
-        except Exception as e:
-            logger.warning("Could not read iframe body: %s", e)
+    # Dump full iframe body text to see what's rendered
+    try:
+        body_text = await iframe.evaluate(BODY_TEXT_JS, 1000)
+        logger.info("Iframe body text (first 1000 chars):\n%s", body_text)
+    except Exception as e:
+        logger.warning("Could not read iframe body: %s", e)
 
-        # Pierce Shadow DOM on #root to read calendar content
+    # Pierce Shadow DOM on #root to read calendar content; without one the
+    # body text above already covers it
+    if has_shadow:
         try:
             shadow_html = await iframe.evaluate(
-                "() => document.querySelector('#root')?.shadowRoot?.innerHTML || 'NO SHADOW ROOT'"
+                "() => window.__root__.innerHTML.slice(0, 4000)"
             )
-            logger.info("Shadow DOM innerHTML (first 4000 chars):\n%s", shadow_html[:4000])
+            logger.info("Shadow DOM innerHTML (first 4000 chars):\n%s", shadow_html)
         except Exception as e:
             logger.warning("Could not read Shadow DOM: %s", e)
 
-        # Click the event via Playwright's shadow-piercing text selector
-        clicked = False
-        for selector in [
-            "text=Sale in Execution",
-            "text=Sale",
-        ]:
-            try:
-                el = await iframe.wait_for_selector(selector, timeout=5_000)
-                logger.info("Clicking selector '%s'...", selector)
-                await el.click()
-                clicked = True
-                break
-            except Exception:
-                continue
-
-        if not clicked:
-            logger.warning("Could not find event card.")
-            await browser.close()
-            return
+    # Click the event via Playwright's shadow-piercing text selector
+    # Both selectors are raced rather than tried one after the other. A
+    # generic match also matches whatever the specific selector would, so
+    # when it wins the more specific probes get a short grace period first
+    clicked = False
+    probes = {
+        asyncio.create_task(iframe.wait_for_selector(selector, timeout=5_000)): selector
+        for selector in EVENT_SELECTORS
+    }
 
-        logger.info("Clicked. Waiting for popup...")
-        await asyncio.sleep(8)
+    def rank(task):
+        return EVENT_SELECTORS.index(probes[task])
 
-        # Get full text content of Shadow DOM (strips all HTML tags)
-        try:
-            shadow_text = await iframe.evaluate(
-                "() => document.querySelector('#root')?.shadowRoot?.textContent || 'NO SHADOW ROOT'"
-            )
-            logger.info("Shadow DOM full text after click:\n%s", shadow_text)
-        except Exception as e:
-            logger.warning("Could not read Shadow DOM text: %s", e)
+    def resolved(tasks):
+        return [t for t in tasks if t.exception() is None and t.result() is not None]
+
+    pending = set(probes)
+    el = None
+    while pending and el is None:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        found = resolved(done)
+        if found:
+            task = min(found, key=rank)
+            better = {t for t in pending if rank(t) < rank(task)}
+            if better:
+                done, _ = await asyncio.wait(better, timeout=SELECTOR_GRACE_S)
+                pending -= done
+                task = min(resolved(done) + [task], key=rank)
+            el, selector = task.result(), probes[task]
+    for task in pending:
+        task.cancel()
 
-        # Also get innerHTML but look specifically for popup/modal/details elements
+    # Armed before the click so a tab opened by it cannot be missed; left
+    # pending while the popup is read and only awaited at the end
+    new_tab_waiter = None
+    if el is not None:
+        new_tab_waiter = asyncio.create_task(
+            page.context.wait_for_event("page", timeout=NEW_TAB_TIMEOUT_MS)
+        )
         try:
-            popup_html = await iframe.evaluate("""() => {
-                const root = document.querySelector('#root')?.shadowRoot;
-                if (!root) return 'NO SHADOW ROOT';
-                const popup = root.querySelector('[class*=\"popup\"], [class*=\"modal\"], [class*=\"detail\"], [class*=\"event-detail\"], [class*=\"popover\"]');
-                if (popup) return popup.innerHTML;
-                return 'NO POPUP ELEMENT FOUND. All classes: ' +
-                    Array.from(root.querySelectorAll('[class]')).map(el => el.className).join(' | ');
-            }""")
-            logger.info("Popup/detail element:\n%s", popup_html[:3000])
+            logger.info("Clicking selector '%s'...", selector)
+            await el.click()
+            clicked = True
         except Exception as e:
-            logger.warning("Could not find popup element: %s", e)
-
-        # Check any new tabs opened by the "Click here for the list" link
-        if new_pages:
-            for np in new_pages:
-                await asyncio.sleep(3)
-                logger.info("New tab URL: %s", np.url)
-                try:
-                    body = await np.inner_text("body")
-                    logger.info("New tab body (first 2000 chars):\n%s", body[:2000])
-                except Exception as e:
-                    logger.info("Could not get new tab text: %s", e)
+            logger.warning("Click failed: %s", e)
+
+    if not clicked:
+        if new_tab_waiter is not None:
+            new_tab_waiter.cancel()
+        logger.warning("Could not find event card.")
+        return
+
+    logger.info("Clicked. Waiting for popup...")
+    try:
+        await iframe.wait_for_function(POPUP_OPEN_JS, arg=POPUP_SEL, timeout=15_000)
+    except Exception as e:
+        logger.warning("No popup appeared: %s", e)
+
+    # Calendar root text (strips all HTML tags) and the popup/modal/details
+    # element in one round-trip, truncated before it is sent back.
+    # The popup is found with one depth-first walk in document order,
+    # descending into nested shadow roots; class names are collected on
+    # the way for the not-found message
+    try:
+        after_click = await iframe.evaluate("""sel => {
+            const root = window.__root__;
+            if (!root) return null;
+            const classes = [];
+            const stack = [root];
+            let popup = null;
+            while (stack.length) {
+                const node = stack.pop();
+                if (node.matches?.(sel)) {
+                    popup = node.innerHTML;
+                    break;
+                }
+                if (node.classList && node.classList.length) {
+                    classes.push(node.getAttribute('class'));
+                }
+                if (node.shadowRoot) stack.push(node.shadowRoot);
+                const kids = node.children || [];
+                for (let i = kids.length - 1; i >= 0; i--) stack.push(kids[i]);
+            }
+            return {
+                text: root.textContent.slice(0, 4000),
+                popup: (popup ?? 'NO POPUP ELEMENT FOUND. All classes: ' +
+                    classes.join(' | ')).slice(0, 3000),
+            };
+        }""", POPUP_SEL)
+        if after_click is None:
+            logger.warning("Calendar root not resolved after click")
         else:
-            logger.info("No new tab opened after click.")
+            logger.info("Calendar text after click (first 4000 chars):\n%s",
+                        after_click["text"])
+            logger.info("Popup/detail element:\n%s", after_click["popup"])
+    except Exception as e:
+        logger.warning("Could not read Shadow DOM after click: %s", e)
 
-        logger.info("\n--- All Sheroot/Listfixed/PDF responses ---")
-        for url, ct, status in responses_seen:
-            if "sheroot" in url.lower() or "listfixed" in url.lower() or "pdf" in ct.lower():
-                logger.info("  [%s] %s  (%s)", status, url, ct)
+    # Check the tab opened by the "Click here for the list" link, if any
+    try:
+        new_tab = await new_tab_waiter
+    except Exception:
+        new_tab = None
+    if new_tab is not None:
+        try:
+            await new_tab.wait_for_load_state("domcontentloaded")
+            logger.info("New tab URL: %s", new_tab.url)
+            body = await new_tab.evaluate(BODY_TEXT_JS, 2000)
+            logger.info("New tab body (first 2000 chars):\n%s", body)
+        except Exception as e:
+            logger.info("Could not get new tab text: %s", e)
+    else:
+        logger.info("No new tab opened after click.")
 
-        await asyncio.sleep(3)
-        await browser.close()
+    logger.info("\n--- All Sheroot/Listfixed/PDF responses ---")
+    for url, ct, status in responses_seen:
+        logger.info("  [%s] %s  (%s)", status, url, ct)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,44 @@
-import sys, asyncio, logging
+import sys, os, asyncio, logging
 sys.stdout.reconfigure(encoding="utf-8")
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
-from scraper.sheroot_scraper import scrape_listings
-
-results = asyncio.run(scrape_listings())
-sep = "=" * 60
-for i, evt in enumerate(results, 1):
-    print(f"\n{sep}")
-    print(f"Event {i}: {evt['title']}")
-    print(f"Date    : {evt['date']}")
-    print(f"Links   : {evt['links']}")
-    print(f"Raw text length: {len(evt['raw_text'])} chars")
-    print(f"\nFull raw_text:\n{evt['raw_text']}")
+from playwright.async_api import async_playwright
+from scraper.sheroot_scraper import BROWSER_LAUNCH_OPTIONS, USER_AGENT, scrape_listings
+
+# Browser profile kept between runs so its HTTP/disk cache is reused
+PROFILE_DIR = ".pw-profile"
+# QUIET=1 (or true/yes) prints the per-event summary without the full raw_text
+QUIET = os.environ.get("QUIET", "").lower() in ("1", "true", "yes")
+
+
+async def main():
+    # One persistent browser context, handed to the scraper instead of it
+    # launching its own
+    async with async_playwright() as pw:
+        context = await pw.chromium.launch_persistent_context(
+            PROFILE_DIR, user_agent=USER_AGENT, **BROWSER_LAUNCH_OPTIONS
+        )
+        try:
+            return await scrape_listings(context=context)
+        finally:
+            await context.close()
+
+
+if __name__ == "__main__":
+    # Guarded: the scraper's PDF worker processes re-import this module
+    # under spawn/forkserver and must not start another scrape
+    results = asyncio.run(main())
+    sep = "=" * 60
+    # One buffered write per event instead of a print() per line
+    w = sys.stdout.write
+    for i, evt in enumerate(results, 1):
+        parts = [
+            f"\n{sep}",
+            f"Event {i}: {evt['title']}",
+            f"Date    : {evt['date']}",
+            f"Links   : {evt['links']}",
+            f"Raw text length: {len(evt['raw_text'])} chars",
+        ]
+        if not QUIET:
+            parts.append(f"\nFull raw_text:\n{evt['raw_text']}")
+        w("\n".join(parts) + "\n")
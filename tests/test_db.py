@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # config refuses to import without a token
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
+    from database import db as db_module
+
+    monkeypatch.setattr(db_module, "DATABASE_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setattr(db_module, "_conn", None)
+    monkeypatch.setattr(db_module, "_upcoming_cache", {"key": None, "ts": 0.0, "rows": []})
+    db_module.init_db()
+    db_module.upsert_user(1, 1, "tester")
+    yield db_module
+    db_module.get_connection().close()
+
+
+def test_keywords_starting_with_bracket_round_trip(db):
+    db.upsert_preference(1, location_keywords=["[foo", "Bar]"])
+
+    assert db.get_preference(1)["location_keywords"] == ["[foo", "bar]"]
+    assert db.get_all_active_preferences()[0]["location_keywords"] == ["[foo", "bar]"]
+
+
+def test_legacy_json_keywords_are_reencoded(db):
+    with db.db_cursor() as cur:
+        cur.execute(
+            "INSERT INTO preferences (telegram_id, location_keywords, active) VALUES (?, ?, 1)",
+            (1, json.dumps(["roodepoort", "krugersdorp"])),
+        )
+    db.init_db()
+
+    assert db.get_preference(1)["location_keywords"] == ["roodepoort", "krugersdorp"]
+
+
+def test_upcoming_summary_cache_is_reset_by_inserts(db):
+    from parser.listing_parser import Property
+
+    def prop(number):
+        return Property("2099-01-01", number, f"Property {number}", None, None, "", "")
+
+    db.upsert_properties_bulk([prop(1)])
+    assert len(db.get_upcoming_properties_summary("2000-01-01")) == 1
+
+    db.upsert_properties_bulk([prop(2)])
+    assert len(db.get_upcoming_properties_summary("2000-01-01")) == 2
@@ -0,0 +1,57 @@
+"""
+Process pool shared by the CPU-bound PDF work: text extraction in the
+scraper and property parsing in the scheduler.
+
+The pool is created on first use and kept for the life of the process, so a
+scrape job does not fork a fresh set of workers for every step.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_pool: ProcessPoolExecutor | None = None
+_pool_size = 0
+
+
+def get_process_pool(jobs: int) -> ProcessPoolExecutor:
+    """
+    Return the shared pool with at least min(jobs, CPU count) workers.
+
+    A call wanting more workers than the current pool has replaces it; work
+    already queued on the old pool still finishes.
+    """
+    global _pool, _pool_size
+    size = max(1, min(jobs, os.cpu_count() or 1))
+    if _pool is None or size > _pool_size:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=size)
+        _pool_size = size
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop pool if it is still the shared one, so the next call rebuilds it."""
+    global _pool, _pool_size
+    if _pool is pool:
+        _pool = None
+        _pool_size = 0
+    pool.shutdown(wait=False)
+
+
+async def run_in_process(jobs: int, fn, *args):
+    """
+    Run fn(*args) in the shared pool sized for jobs concurrent calls.
+
+    A worker dying breaks the whole pool and fails every call queued on it.
+    The broken pool is discarded before the error propagates, so later
+    calls get a fresh one instead of failing for the rest of the process.
+    """
+    pool = get_process_pool(jobs)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise